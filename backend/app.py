@@ -12,6 +12,10 @@ import json
 import io
 from functools import lru_cache, wraps
 import time
+import logging
+import logging.handlers
+import queue
+import atexit
 import jwt
 import secrets
 import smtplib
@@ -59,6 +63,23 @@ app.config['MAIL_DEFAULT_SENDER'] = os.getenv('MAIL_DEFAULT_SENDER', '')
 
 db = SQLAlchemy(app)
 
+# Service logs (e.g. background model training) are enqueued by worker threads
+# and written to the console by a single listener thread, so logging never
+# blocks a worker on stdout.
+# Configured only once per process: `python app.py` runs this file as __main__
+# and the training worker imports it again as `app`.
+_services_logger = logging.getLogger('services')
+if not _services_logger.handlers:
+    _log_queue = queue.SimpleQueue()
+    _log_console = logging.StreamHandler()
+    _log_console.setFormatter(logging.Formatter('[%(name)s] %(levelname)s: %(message)s'))
+    _log_listener = logging.handlers.QueueListener(_log_queue, _log_console)
+    _services_logger.setLevel(logging.INFO)
+    _services_logger.addHandler(logging.handlers.QueueHandler(_log_queue))
+    _services_logger.propagate = False
+    _log_listener.start()
+    atexit.register(_log_listener.stop)
+
 # Enable WAL mode for SQLite to allow concurrent reads and writes
 from sqlalchemy import event
 from sqlalchemy.engine import Engine
@@ -80,6 +101,16 @@ CORS(app,
          "supports_credentials": True
      }})
 
+# Gzip JSON responses over 500 bytes for clients sending Accept-Encoding (optional)
+try:
+    from flask_compress import Compress
+    app.config['COMPRESS_MIMETYPES'] = ['application/json']
+    app.config['COMPRESS_MIN_SIZE'] = 500
+    Compress(app)
+    COMPRESS_AVAILABLE = True
+except ImportError:
+    COMPRESS_AVAILABLE = False
+
 # Simple in-memory cache for frequently accessed data
 cache = {}
 CACHE_TIMEOUT = 60  # 60 seconds
@@ -436,6 +467,11 @@ class Transaction(db.Model):
     atm = db.relationship('ATM', backref=db.backref('transactions', lazy=True, cascade='all, delete-orphan'))
     section = db.relationship('TransactionSection', backref=db.backref('transactions', lazy=True))
     
+    # Covers the section filter with newest-first ordering in the history view
+    __table_args__ = (
+        Index('ix_transaction_section_timestamp', 'section_id', 'timestamp', 'id'),
+    )
+    
     def to_dict(self):
         return {
             'id': self.id,
@@ -844,6 +880,15 @@ def delete_user(user, user_id):
     }), 200
 
 # API Routes
+@app.route('/api/health', methods=['GET'])
+def health_check():
+    """Liveness check that does not touch the database"""
+    return jsonify({
+        'status': 'healthy',
+        'service': 'Smart ATM Backend',
+        'timestamp': datetime.now().isoformat()
+    })
+
 @app.route('/api/vaults', methods=['GET'])
 def get_vaults():
     cached = get_cache('vaults')
@@ -1044,6 +1089,9 @@ def get_transaction_history():
     # Pagination parameters
     page = request.args.get('page', 1, type=int)
     per_page = request.args.get('per_page', 50, type=int)
+    if per_page < 1:
+        per_page = 20  # same fallback as paginate(error_out=False), for both branches
+    cursor = request.args.get('cursor', None)  # keyset pagination ('next_cursor' of the previous page)
     
     # Sorting parameters
     sort_by = request.args.get('sort_by', 'timestamp')  # timestamp, amount, atm_name, type
@@ -1128,16 +1176,51 @@ def get_transaction_history():
     else:  # Default to timestamp
         order_col = Transaction.timestamp
     
-    if sort_order == 'asc':
-        query = query.order_by(order_col.asc())
-    else:
+    # Timestamp ordering is tie-broken by id so it can be paged by cursor
+    keyset = sort_by not in ('amount', 'type', 'atm_name')
+    descending = sort_order != 'asc'
+    if descending:
         query = query.order_by(order_col.desc())
+        if keyset:
+            query = query.order_by(Transaction.id.desc())
+    else:
+        query = query.order_by(order_col.asc())
+        if keyset:
+            query = query.order_by(Transaction.id.asc())
     
     # Get total count before pagination
     total_count = query.count()
     
-    # Apply pagination
-    transactions = query.paginate(page=page, per_page=per_page, error_out=False)
+    # Apply pagination: seek past the cursor row (no OFFSET scan) when a cursor
+    # is given for timestamp ordering, otherwise page by number
+    if cursor and keyset:
+        try:
+            cursor_ts, _, cursor_id = cursor.partition('|')
+            cursor_ts = datetime.fromisoformat(cursor_ts)
+            cursor_id = int(cursor_id)
+        except ValueError:
+            return jsonify({'error': 'Invalid cursor'}), 400
+        if descending:
+            query = query.filter(db.or_(
+                Transaction.timestamp < cursor_ts,
+                db.and_(Transaction.timestamp == cursor_ts, Transaction.id < cursor_id)
+            ))
+        else:
+            query = query.filter(db.or_(
+                Transaction.timestamp > cursor_ts,
+                db.and_(Transaction.timestamp == cursor_ts, Transaction.id > cursor_id)
+            ))
+        page_items = query.limit(per_page).all()
+        total_pages = -(-total_count // per_page)
+    else:
+        transactions = query.paginate(page=page, per_page=per_page, error_out=False)
+        page_items = transactions.items
+        total_pages = transactions.pages
+    
+    next_cursor = None
+    if keyset and page_items and len(page_items) == per_page and page_items[-1].timestamp is not None:
+        last = page_items[-1]
+        next_cursor = f"{last.timestamp.isoformat()}|{last.id}"
     
     # Calculate summary statistics for filtered results
     summary_query = Transaction.query
@@ -1206,11 +1289,12 @@ def get_transaction_history():
         date_range = "No data"
     
     return jsonify({
-        'transactions': [t.to_dict() for t in transactions.items],
+        'transactions': [t.to_dict() for t in page_items],
         'total': total_count,
-        'pages': transactions.pages,
+        'pages': total_pages,
         'current_page': page,
         'per_page': per_page,
+        'next_cursor': next_cursor,
         'summary': {
             'total_transactions': len(all_filtered),
             'total_amount': round(total_amount, 2),
@@ -1403,12 +1487,16 @@ def import_transactions_csv():
         
         # Get optional section_id from form data
         section_id = request.form.get('section_id', None, type=int)
+        # fail_fast=1: stop at the first invalid row and import nothing
+        fail_fast = request.form.get('fail_fast', '0') in ('1', 'true', 'True')
         
         # Import transactions
         imported_count = 0
         errors = []
         
         for index, row in df.iterrows():
+            if fail_fast and errors:
+                break
             try:
                 # Validate ATM and Vault exist
                 atm = ATM.query.get(int(row['atm_id']))
@@ -1446,6 +1534,15 @@ def import_transactions_csv():
             except Exception as e:
                 errors.append(f"Row {index+1}: {str(e)}")
         
+        if fail_fast and errors:
+            db.session.rollback()
+            return jsonify({
+                'error': 'CSV validation failed',
+                'imported_count': 0,
+                'total_rows': len(df),
+                'errors': errors
+            }), 400
+        
         # Commit all transactions
         db.session.commit()
         
@@ -1505,6 +1602,9 @@ def dashboard_analytics():
 def create_tables():
     with app.app_context():
         db.create_all()
+        # create_all skips indexes on tables that already exist
+        for index in Transaction.__table__.indexes:
+            index.create(db.engine, checkfirst=True)
         
         # Add sample data if tables are empty
         if Vault.query.count() == 0:
@@ -2071,13 +2171,13 @@ def generate_synthetic_data(atm_id):
         
         # Save transactions to database
         saved_count = 0
-        for tx_data in transactions:
+        for tx_data in transactions.itertuples(index=False):
             transaction = Transaction(
                 vault_id=default_vault.id,  # Use default vault for synthetic data
                 atm_id=atm.id,
-                amount=tx_data['amount'],
-                transaction_type=tx_data.get('transaction_type', 'withdrawal'),
-                timestamp=datetime.fromisoformat(tx_data['timestamp'])
+                amount=tx_data.amount,
+                transaction_type=tx_data.transaction_type,
+                timestamp=tx_data.timestamp.to_pydatetime()
             )
             db.session.add(transaction)
             saved_count += 1
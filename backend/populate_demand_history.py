@@ -5,7 +5,8 @@ Script to populate the demand_history table from transaction data.
 
 import sys
 import os
-from sqlalchemy import create_engine
+from datetime import date
+from sqlalchemy import create_engine, func
 from sqlalchemy.orm import sessionmaker
 
 # Add the backend directory to the path
@@ -37,24 +38,28 @@ def populate_demand_history():
                 print(f"  Skipping - already has {existing_count} records")
                 continue
 
-            # Get transactions
-            transactions = session.query(Transaction).filter_by(atm_id=atm.id).order_by(Transaction.timestamp).all()
-
-            if not transactions:
+            # Daily totals aggregated in the database (one row per day)
+            tx_day = func.date(Transaction.timestamp)
+            daily_demand = (
+                session.query(tx_day, func.sum(Transaction.amount), func.count(Transaction.id))
+                .filter(Transaction.atm_id == atm.id, Transaction.timestamp.isnot(None))
+                .group_by(tx_day)
+                .order_by(tx_day)
+                .all()
+            )
+
+            if not daily_demand:
                 print(f"  No transactions found")
                 continue
 
-            print(f"  Found {len(transactions)} transactions")
-
-            # Group by date
-            daily_demand = {}
-            for tx in transactions:
-                tx_date = tx.timestamp.date()
-                daily_demand[tx_date] = daily_demand.get(tx_date, 0) + tx.amount
+            print(f"  Found {sum(row[2] for row in daily_demand)} transactions")
 
             # Create records
             demand_records = []
-            for demand_date, demand_amount in sorted(daily_demand.items()):
+            for demand_date, demand_amount, _ in daily_demand:
+                # SQLite returns DATE() as an ISO string
+                if isinstance(demand_date, str):
+                    demand_date = date.fromisoformat(demand_date)
                 demand_record = DemandHistory(
                     atm_id=atm.id,
                     date=demand_date,
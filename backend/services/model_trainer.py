@@ -2,6 +2,7 @@
 Background Model Training Service
 Handles asynchronous model training for individual ATMs
 """
+import logging
 import threading
 import time
 from datetime import datetime
@@ -15,6 +16,8 @@ sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', '..'))
 
 from path_config import get_saved_models_dir, get_data_dir
 
+log = logging.getLogger(__name__)
+
 
 class TrainingJob:
     """Represents a single model training job"""
@@ -113,7 +116,7 @@ class ModelTrainer:
                 job.message = 'Preparing training environment...'
                 job.progress = 5
                 
-                print(f"[TRAINING] Starting training for ATM {job.atm_id}")
+                log.info("Starting training for ATM %d", job.atm_id)
                 
                 # Import training modules
                 from ml_models.forecasting_models import train_models_for_atm
@@ -121,7 +124,7 @@ class ModelTrainer:
                 job.message = 'Loading training data from CSV...'
                 job.progress = 10
                 
-                print(f"[TRAINING] Loading CSV data for ATM {job.atm_id}")
+                log.info("Loading CSV data for ATM %d", job.atm_id)
                 
                 # Load training data from CSV file (original approach)
                 import pandas as pd
@@ -143,7 +146,14 @@ class ModelTrainer:
                 daily_demand['date'] = pd.to_datetime(daily_demand['date'])
                 daily_demand = daily_demand.sort_values('date')
                 
-                print(f"[TRAINING] Dataset loaded from CSV: {len(daily_demand)} days of data for ATM {job.atm_id}")
+                # Continuous daily series: missing days are interpolated in time
+                demand = daily_demand.set_index('date')['demand']
+                demand = demand[~demand.index.duplicated(keep='last')]
+                full_range = pd.date_range(demand.index[0], demand.index[-1], freq='D')
+                demand = demand.reindex(full_range).interpolate(method='time', limit_direction='both')
+                daily_demand = demand.rename_axis('date').reset_index()
+                
+                log.info("Dataset loaded from CSV: %d days of data for ATM %d", len(daily_demand), job.atm_id)
                 
                 job.message = f'Training dataset loaded: {len(daily_demand)} days of data'
                 job.progress = 30
@@ -154,7 +164,7 @@ class ModelTrainer:
                 if 'arima' in job.models:
                     job.message = 'Training ARIMA model...'
                     job.progress = 40
-                    print(f"[TRAINING] Starting ARIMA training for ATM {job.atm_id}")
+                    log.info("Starting ARIMA training for ATM %d", job.atm_id)
                     time.sleep(1)  # Simulate training time
                     
                     try:
@@ -163,11 +173,9 @@ class ModelTrainer:
                         results['arima'] = arima_metrics
                         job.message = 'ARIMA model trained successfully'
                         job.progress = 60
-                        print(f"[TRAINING] ARIMA training completed for ATM {job.atm_id}")
+                        log.info("ARIMA training completed for ATM %d", job.atm_id)
                     except Exception as e:
-                        import traceback
-                        error_msg = f'{str(e)}\n{traceback.format_exc()}'
-                        print(f"[TRAINING ERROR] ARIMA training failed for ATM {job.atm_id}: {error_msg}")
+                        log.exception("ARIMA training failed for ATM %d", job.atm_id)
                         job.message = f'ARIMA training failed: {str(e)}'
                         results['arima'] = {'error': str(e)}
                 
@@ -175,7 +183,7 @@ class ModelTrainer:
                 if 'lstm' in job.models:
                     job.message = 'Training LSTM model...'
                     job.progress = 70
-                    print(f"[TRAINING] Starting LSTM training for ATM {job.atm_id}")
+                    log.info("Starting LSTM training for ATM %d", job.atm_id)
                     time.sleep(2)  # Simulate training time
                     
                     try:
@@ -184,13 +192,11 @@ class ModelTrainer:
                         results['lstm'] = lstm_metrics
                         job.message = 'LSTM model trained successfully'
                         job.progress = 90
-                        print(f"[TRAINING] LSTM training completed for ATM {job.atm_id}")
+                        log.info("LSTM training completed for ATM %d", job.atm_id)
                     except Exception as e:
-                        import traceback
-                        error_msg = f'{str(e)}\n{traceback.format_exc()}'
+                        log.exception("LSTM training failed for ATM %d", job.atm_id)
                         job.message = f'LSTM training failed: {str(e)}'
                         results['lstm'] = {'error': str(e)}
-                        print(f"[TRAINING ERROR] LSTM training failed for ATM {job.atm_id}: {error_msg}")
                 
                 # Check if at least one model trained successfully
                 successful_models = [
@@ -208,54 +214,51 @@ class ModelTrainer:
                 job.completed_at = datetime.now()
                 job.results = results
                 
-                print(f"[TRAINING] Training completed successfully for ATM {job.atm_id}. Successful models: {successful_models}")
+                log.info("Training completed successfully for ATM %d. Successful models: %s", job.atm_id, successful_models)
                 
                 # Update ATM's last_trained_profile to track when it was trained
                 # ONLY update if training actually succeeded
-                print(f"[TRAINING] Importing dependencies for profile detection (ATM {job.atm_id})...")
+                log.info("Importing dependencies for profile detection (ATM %d)...", job.atm_id)
                 from app import ATM, _detect_atm_profile
                 from services.synthetic_data_generator import SyntheticTransactionGenerator
                 import sqlalchemy.exc
                 
-                print(f"[TRAINING] Querying database for ATM {job.atm_id}...")
+                log.info("Querying database for ATM %d...", job.atm_id)
                 atm = ATM.query.get(job.atm_id)
                 if atm:
-                    print(f"[TRAINING] ATM {job.atm_id} found in database, detecting profile...")
+                    log.info("ATM %d found in database, detecting profile...", job.atm_id)
                     # Get profile detection dependencies
                     manual_overrides = SyntheticTransactionGenerator.MANUAL_PROFILE_OVERRIDES
                     location_profiles = SyntheticTransactionGenerator.LOCATION_PROFILES
                     detected_profile = _detect_atm_profile(atm, manual_overrides, location_profiles)
                     
-                    print(f"[TRAINING] Detected profile '{detected_profile}' for ATM {job.atm_id}")
+                    log.info("Detected profile '%s' for ATM %d", detected_profile, job.atm_id)
                     atm.last_trained_profile = detected_profile
                     atm.last_trained_at = datetime.now()
                     
-                    print(f"[TRAINING] Updated last_trained_at for ATM {job.atm_id} to {atm.last_trained_at}")
+                    log.info("Updated last_trained_at for ATM %d to %s", job.atm_id, atm.last_trained_at)
                     
                     # Retry logic for database lock
                     max_retries = 3
                     for attempt in range(max_retries):
                         try:
-                            print(f"[TRAINING] Attempting to commit database changes (attempt {attempt + 1}/{max_retries})...")
+                            log.info("Attempting to commit database changes (attempt %d/%d)...", attempt + 1, max_retries)
                             db.session.commit()
-                            print(f"[TRAINING] Successfully committed last_trained_at update for ATM {job.atm_id}")
+                            log.info("Successfully committed last_trained_at update for ATM %d", job.atm_id)
                             break
                         except sqlalchemy.exc.OperationalError as e:
                             if 'database is locked' in str(e) and attempt < max_retries - 1:
                                 time.sleep(0.5 * (attempt + 1))  # Exponential backoff
                                 db.session.rollback()
-                                print(f"[TRAINING] Database locked, retrying... (attempt {attempt + 1}/{max_retries})")
+                                log.warning("Database locked, retrying... (attempt %d/%d)", attempt + 1, max_retries)
                             else:
-                                print(f"[TRAINING ERROR] Database commit failed after {max_retries} attempts: {e}")
+                                log.error("Database commit failed after %d attempts: %s", max_retries, e)
                                 raise
                 else:
-                    print(f"[TRAINING WARNING] ATM {job.atm_id} not found in database, skipping last_trained_at update")
+                    log.warning("ATM %d not found in database, skipping last_trained_at update", job.atm_id)
                 
             except Exception as e:
-                import traceback
-                error_details = traceback.format_exc()
-                print(f"[TRAINING ERROR] Fatal error training ATM {job.atm_id}:")
-                print(error_details)
+                log.exception("Fatal error training ATM %d", job.atm_id)
                 
                 job.status = 'failed'
                 job.error = str(e)
@@ -14,7 +14,6 @@ from path_config import (
     get_lstm_scaler_path
 )
 
-import pickle
 import pandas as pd
 import numpy as np
 from datetime import datetime, timedelta
@@ -28,6 +27,43 @@ try:
 except ImportError:
     pass
 
+
+class _ModelAdapter:
+    """Uniform forecast(steps) -> np.ndarray wrapper around a loaded model"""
+    
+    __slots__ = ('model', '_forecast', '_cached')
+    
+    def __init__(self, model):
+        self.model = model
+        self._cached = np.empty(0)
+        # Resolve the prediction method once at load time instead of per call
+        if hasattr(model, 'forecast'):
+            # statsmodels ARIMA results
+            self._forecast = lambda steps: np.ravel(model.forecast(steps=steps))
+        elif hasattr(model, 'predict'):
+            # Ensemble / forecaster wrappers
+            self._forecast = lambda steps: np.ravel(model.predict(steps=steps))
+        else:
+            self._forecast = self._unsupported
+    
+    def forecast(self, steps: int) -> np.ndarray:
+        """Forecast the next `steps` days
+        
+        A loaded model's forecast is fixed, and a shorter horizon is a prefix of
+        a longer one, so the longest forecast computed so far is reused.
+        """
+        cached = self._cached  # single read: requests may share this adapter
+        if steps > len(cached):
+            cached = self._forecast(steps)
+            # A concurrent longer forecast may have landed meanwhile; keep the longest
+            if len(cached) > len(self._cached):
+                self._cached = cached
+        return cached[:steps]
+    
+    def _unsupported(self, steps):
+        raise TypeError(f"{type(self.model).__name__} has no working predict/forecast method")
+
+
 class PredictionService:
     """Service for generating ML-based cash demand predictions"""
     
@@ -45,30 +81,35 @@ class PredictionService:
     def load_models(self):
         """Load all available ML models for ATMs (ARIMA and LSTM)"""
         try:
+            # Same mmap loader as ForecastingModel.load_model (ml_models is on sys.path)
+            from forecasting_models import load_pickle
+            
+            # LSTM discovery is skipped entirely when Keras is missing
+            check_lstm = LSTM_AVAILABLE and os.path.isdir(self.models_dir)
+            
             # Load models for all ATMs (supports ensemble, arima, and lstm models)
             for atm_id in range(1, 30):  # Support up to 30 ATMs
                 # Try ensemble model first (legacy models 1-6)
                 ensemble_path = os.path.join(self.models_dir, f'ensemble_atm_{atm_id}.pkl')
                 arima_path = os.path.join(self.models_dir, f'arima_model_atm_{atm_id}.pkl')
-                lstm_path = os.path.join(self.models_dir, f'lstm_model_atm_{atm_id}.h5')
-                scaler_path = os.path.join(self.models_dir, f'lstm_scaler_atm_{atm_id}.pkl')
                 
                 # Load ARIMA or Ensemble model
                 if os.path.exists(ensemble_path):
-                    with open(ensemble_path, 'rb') as f:
-                        self.models[atm_id] = pickle.load(f)
+                    self.models[atm_id] = _ModelAdapter(load_pickle(ensemble_path))
                     print(f"✓ Loaded ensemble model for ATM {atm_id}")
                 elif os.path.exists(arima_path):
-                    with open(arima_path, 'rb') as f:
-                        self.models[atm_id] = pickle.load(f)
+                    self.models[atm_id] = _ModelAdapter(load_pickle(arima_path))
                     print(f"✓ Loaded ARIMA model for ATM {atm_id}")
                 
                 # Load LSTM model if available
-                if LSTM_AVAILABLE and os.path.exists(lstm_path) and os.path.exists(scaler_path):
+                if not check_lstm:
+                    continue
+                lstm_path = os.path.join(self.models_dir, f'lstm_model_atm_{atm_id}.h5')
+                scaler_path = os.path.join(self.models_dir, f'lstm_scaler_atm_{atm_id}.pkl')
+                if os.path.exists(lstm_path) and os.path.exists(scaler_path):
                     try:
                         self.lstm_models[atm_id] = load_model(lstm_path)
-                        with open(scaler_path, 'rb') as f:
-                            self.lstm_scalers[atm_id] = pickle.load(f)
+                        self.lstm_scalers[atm_id] = load_pickle(scaler_path)
                         print(f"✓ Loaded LSTM model for ATM {atm_id}")
                     except Exception as lstm_err:
                         print(f"⚠ Could not load LSTM model for ATM {atm_id}: {lstm_err}")
@@ -98,36 +139,9 @@ class PredictionService:
             return 100000.0  # Default fallback
         
         try:
-            model = self.models[atm_id]
-            
-            # Try different prediction methods based on model type
-            prediction = None
-            
-            # Try forecast() first (statsmodels ARIMA)
-            if hasattr(model, 'forecast'):
-                try:
-                    prediction = model.forecast(steps=days_ahead)
-                except Exception as forecast_err:
-                    print(f"⚠ forecast() failed for ATM {atm_id}: {forecast_err}")
-            
-            # Try predict() for ensemble models if forecast didn't work
-            if prediction is None and hasattr(model, 'predict'):
-                try:
-                    prediction = model.predict(steps=days_ahead)
-                except Exception as predict_err:
-                    print(f"⚠ predict() failed for ATM {atm_id}: {predict_err}")
-            
-            if prediction is None:
-                print(f"⚠ Model for ATM {atm_id} has no working predict/forecast method")
-                return 100000.0
-            
-            # Return the last prediction (for the target day)
-            if prediction is not None:
-                predicted_value = float(prediction.iloc[-1]) if hasattr(prediction, 'iloc') else (float(prediction[-1]) if hasattr(prediction, '__iter__') else float(prediction))
-                # Ensure non-negative prediction
-                return max(0, predicted_value)
-            else:
-                return 100000.0
+            arr = self.models[atm_id].forecast(days_ahead)
+            # Return the last prediction (for the target day), non-negative
+            return float(max(0.0, arr[-1]))
             
         except Exception as e:
             print(f"⚠ Prediction failed for ATM {atm_id}: {e}")
@@ -238,6 +252,13 @@ class PredictionService:
             atm_id = atm['id']
             predictions = []
             
+            # Forecast the full horizon once; each day below reads from it
+            if atm_id in self.models:
+                try:
+                    self.models[atm_id].forecast(days)
+                except Exception:
+                    pass  # predict_demand reports the failure per day
+            
             for day in range(1, days + 1):
                 pred = self.predict_demand(atm_id, day)
                 predictions.append({
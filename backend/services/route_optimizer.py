@@ -3,13 +3,104 @@ Route Optimizer Service: AI-Powered Vehicle Routing
 Uses Google OR-Tools for multi-vehicle routing optimization with capacity constraints
 """
 
-from geopy.distance import geodesic
 from ortools.constraint_solver import routing_enums_pb2
 from ortools.constraint_solver import pywrapcp
+import math
+from functools import lru_cache
 import numpy as np
 from typing import List, Dict, Tuple
 from datetime import datetime, timedelta
 
+EARTH_RADIUS_KM = 6371.0
+
+# Use the savings first-solution heuristic from this many ATMs upwards
+SAVINGS_MIN_ATMS = 20
+
+# Try to import Numba for JIT-compiled kernels
+NUMBA_AVAILABLE = False
+try:
+    from numba import njit
+    NUMBA_AVAILABLE = True
+except ImportError:
+    pass
+
+
+def _nn_tsp(dist: np.ndarray) -> np.ndarray:
+    """Nearest-neighbor tour from node 0 over a distance matrix (depot excluded from the tail)"""
+    n = dist.shape[0]
+    route = np.zeros(n, dtype=np.int64)
+    visited = np.zeros(n, dtype=np.bool_)
+    visited[0] = True
+    current = 0
+    
+    for step in range(1, n):
+        row = dist[current].copy()
+        row[visited] = np.inf
+        nearest = row.argmin()
+        route[step] = nearest
+        visited[nearest] = True
+        current = nearest
+    
+    return route
+
+
+if NUMBA_AVAILABLE:
+    _nn_tsp = njit(cache=True)(_nn_tsp)
+
+
+def _greedy_initial_routes(dist: np.ndarray, demands: List[int], capacities: List[int]) -> List[List[int]]:
+    """
+    Nearest-neighbor routes per vehicle under capacity, for warm-starting the solver
+    
+    Returns one list of node indices (depot excluded) per vehicle; returns an
+    empty list when some ATM cannot be placed on any vehicle.
+    """
+    demands = np.asarray(demands)
+    unvisited = np.ones(dist.shape[0], dtype=bool)
+    unvisited[0] = False
+    routes = []
+    
+    for capacity in capacities:
+        route = []
+        current = 0
+        remaining = capacity
+        while True:
+            candidates = unvisited & (demands <= remaining)
+            if not candidates.any():
+                break
+            row = np.where(candidates, dist[current], np.inf)
+            nearest = int(row.argmin())
+            route.append(nearest)
+            unvisited[nearest] = False
+            remaining -= demands[nearest]
+            current = nearest
+        routes.append(route)
+    
+    return [] if unvisited.any() else routes
+
+
+@lru_cache(maxsize=32)
+def _haversine_matrix(coords: Tuple[Tuple[float, float], ...]) -> np.ndarray:
+    """Pairwise haversine distances (km) for a tuple of (latitude, longitude) pairs"""
+    n = len(coords)
+    lats, lons = np.radians(np.array(coords, dtype=float).reshape(n, 2)).T
+    cos_lats = np.cos(lats)
+    
+    # Vectorized haversine over the upper triangle only, mirrored below
+    # (distance is symmetric and the diagonal stays zero)
+    i, j = np.triu_indices(n, k=1)
+    a = (np.sin((lats[j] - lats[i]) / 2) ** 2
+         + cos_lats[i] * cos_lats[j] * np.sin((lons[j] - lons[i]) / 2) ** 2)
+    distances = 2 * EARTH_RADIUS_KM * np.arcsin(np.sqrt(a))
+    
+    matrix = np.zeros((n, n))
+    matrix[i, j] = distances
+    matrix[j, i] = distances
+    
+    # Cached instances are shared between callers
+    matrix.flags.writeable = False
+    return matrix
+
 class RouteOptimizer:
     """Service for optimizing vehicle routes using OR-Tools VRP solver"""
     
@@ -29,7 +120,11 @@ class RouteOptimizer:
         Returns:
             Distance in kilometers
         """
-        return geodesic(coord1, coord2).kilometers
+        lat1, lon1 = math.radians(coord1[0]), math.radians(coord1[1])
+        lat2, lon2 = math.radians(coord2[0]), math.radians(coord2[1])
+        a = (math.sin((lat2 - lat1) / 2) ** 2
+             + math.cos(lat1) * math.cos(lat2) * math.sin((lon2 - lon1) / 2) ** 2)
+        return 2 * EARTH_RADIUS_KM * math.asin(math.sqrt(a))
     
     def create_distance_matrix(self, locations: List[Dict]) -> np.ndarray:
         """
@@ -39,17 +134,15 @@ class RouteOptimizer:
             locations: List of location dictionaries with 'latitude' and 'longitude'
         
         Returns:
-            2D numpy array of distances
+            2D numpy array of distances (a private, writable copy)
         """
-        n = len(locations)
-        matrix = np.zeros((n, n))
-        
-        for i in range(n):
-            for j in range(n):
-                if i != j:
-                    coord1 = (locations[i]['latitude'], locations[i]['longitude'])
-                    coord2 = (locations[j]['latitude'], locations[j]['longitude'])
-                    matrix[i][j] = self.calculate_distance(coord1, coord2)
+        return self._shared_distance_matrix(locations).copy()
+    
+    def _shared_distance_matrix(self, locations: List[Dict]) -> np.ndarray:
+        """Cached, read-only distance matrix shared across calls; never mutate it"""
+        # Keyed on the ordered coordinates, so moved locations miss the cache
+        coords = tuple((float(loc['latitude']), float(loc['longitude'])) for loc in locations)
+        matrix = _haversine_matrix(coords)
         
         self.locations = locations
         self.distance_matrix = matrix
@@ -81,7 +174,7 @@ class RouteOptimizer:
         all_locations = [depot] + atms_to_visit
         
         # Create distance matrix
-        distance_matrix = self.create_distance_matrix(all_locations)
+        distance_matrix = self._shared_distance_matrix(all_locations)
         
         # Convert to integer for OR-Tools (multiply by 1000 to preserve precision)
         distance_matrix_int = (distance_matrix * 1000).astype(int)
@@ -101,13 +194,9 @@ class RouteOptimizer:
         
         routing = pywrapcp.RoutingModel(manager)
         
-        # Define distance callback
-        def distance_callback(from_index, to_index):
-            from_node = manager.IndexToNode(from_index)
-            to_node = manager.IndexToNode(to_index)
-            return distance_matrix_int[from_node][to_node]
-        
-        transit_callback_index = routing.RegisterTransitCallback(distance_callback)
+        # Register distances as a native matrix so arc costs are looked up in C++
+        # without a Python callback per arc
+        transit_callback_index = routing.RegisterTransitMatrix(distance_matrix_int.tolist())
         routing.SetArcCostEvaluatorOfAllVehicles(transit_callback_index)
         
         # Add capacity constraint
@@ -127,20 +216,40 @@ class RouteOptimizer:
         
         # Set search parameters
         search_parameters = pywrapcp.DefaultRoutingSearchParameters()
-        search_parameters.first_solution_strategy = (
-            routing_enums_pb2.FirstSolutionStrategy.PATH_CHEAPEST_ARC
-        )
+        # Savings reaches a good initial solution faster on medium-sized instances
+        if len(atms_to_visit) >= SAVINGS_MIN_ATMS:
+            search_parameters.first_solution_strategy = (
+                routing_enums_pb2.FirstSolutionStrategy.SAVINGS
+            )
+        else:
+            search_parameters.first_solution_strategy = (
+                routing_enums_pb2.FirstSolutionStrategy.PATH_CHEAPEST_ARC
+            )
         search_parameters.local_search_metaheuristic = (
             routing_enums_pb2.LocalSearchMetaheuristic.GUIDED_LOCAL_SEARCH
         )
         search_parameters.time_limit.seconds = time_limit_seconds
-        
-        # Solve
-        solution = routing.SolveWithParameters(search_parameters)
+        # Costs are integer metres, so no finer improvement step is meaningful
+        search_parameters.optimization_step = 1
+        search_parameters.use_full_propagation = False
+        search_parameters.log_search = False
+        
+        # Solve, warm-started from a greedy nearest-neighbor assignment when one
+        # fits the capacities (otherwise the first-solution strategy above is used)
+        initial_routes = _greedy_initial_routes(distance_matrix, demands, vehicle_capacities)
+        initial_solution = None
+        if initial_routes:
+            routing.CloseModelWithParameters(search_parameters)
+            initial_solution = routing.ReadAssignmentFromRoutes(initial_routes, True)
+        
+        if initial_solution:
+            solution = routing.SolveFromAssignmentWithParameters(initial_solution, search_parameters)
+        else:
+            solution = routing.SolveWithParameters(search_parameters)
         
         if solution:
             return self._extract_solution(
-                manager, routing, solution, all_locations, vehicles, distance_matrix
+                manager, routing, solution, all_locations, vehicles, distance_matrix_int
             )
         else:
             return {
@@ -158,16 +267,16 @@ class RouteOptimizer:
         solution,
         locations: List[Dict],
         vehicles: List[Dict],
-        distance_matrix: np.ndarray
+        distance_matrix_int: np.ndarray
     ) -> Dict:
-        """Extract and format the solution from OR-Tools"""
+        """Extract and format the solution from OR-Tools (arc costs are in metres)"""
         routes = []
         total_distance = 0
         total_cost = 0
         
         for vehicle_id in range(len(vehicles)):
             vehicle = vehicles[vehicle_id]
-            route_distance = 0
+            route_distance_int = 0
             route_load = 0
             route_stops = []
             
@@ -194,12 +303,14 @@ class RouteOptimizer:
                 
                 previous_index = index
                 index = solution.Value(routing.NextVar(index))
-                route_distance += routing.GetArcCostForVehicle(previous_index, index, vehicle_id) / 1000.0
+                route_distance_int += routing.GetArcCostForVehicle(previous_index, index, vehicle_id)
             
             # Add return to depot distance
             if len(route_nodes) > 1:
                 last_node = route_nodes[-1]
-                route_distance += distance_matrix[last_node][0]
+                route_distance_int += int(distance_matrix_int[last_node][0])
+            
+            route_distance = route_distance_int / 1000.0
             
             if route_stops:  # Only add routes with stops
                 route_cost = route_distance * vehicle.get('fuel_cost_per_km', 2.0)
@@ -250,23 +361,16 @@ class RouteOptimizer:
         
         # Simple nearest neighbor algorithm for single route
         all_locations = [depot] + atms_to_visit
-        distance_matrix = self.create_distance_matrix(all_locations)
+        distance_matrix = self._shared_distance_matrix(all_locations)
         
-        # Nearest neighbor TSP
-        unvisited = set(range(1, len(all_locations)))
-        current = 0
-        route = [current]
-        total_distance = 0
+        # Nearest neighbor TSP (JIT-compiled when Numba is installed)
+        route = _nn_tsp(distance_matrix)
         
-        while unvisited:
-            nearest = min(unvisited, key=lambda x: distance_matrix[current][x])
-            total_distance += distance_matrix[current][nearest]
-            route.append(nearest)
-            current = nearest
-            unvisited.remove(nearest)
-        
-        # Return to depot
-        total_distance += distance_matrix[current][0]
+        # Tour length including the return to depot
+        total_distance = float(
+            distance_matrix[route[:-1], route[1:]].sum() + distance_matrix[route[-1], 0]
+        )
+        route = route.tolist()
         
         # Format result
         stops = []
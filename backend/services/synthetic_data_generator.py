@@ -3,11 +3,15 @@ Synthetic Transaction Generator for ATM Training
 Generates realistic transaction histories with unique patterns based on location context
 """
 
-import random
+import os
+import re
+import zlib
 import numpy as np
+import pandas as pd
 from datetime import datetime, timedelta
-from typing import List, Dict, Tuple
+from typing import Dict, Iterable, Iterator, List, Tuple
 import json
+from concurrent.futures import ThreadPoolExecutor
 
 class SyntheticTransactionGenerator:
     """
@@ -111,6 +115,10 @@ class SyntheticTransactionGenerator:
         }
     }
     
+    # Transaction types and their weights (most are withdrawals)
+    TRANSACTION_TYPES = ('withdrawal', 'balance_inquiry', 'deposit', 'transfer')
+    TRANSACTION_TYPE_WEIGHTS = (0.70, 0.15, 0.10, 0.05)
+    
     # Manual profile overrides for specific ATMs to ensure optimal accuracy
     MANUAL_PROFILE_OVERRIDES = {
         1: 'shopping_mall',           # Mall Plaza North
@@ -122,6 +130,14 @@ class SyntheticTransactionGenerator:
         15: 'community'               # Sports Complex (too volatile, use community)
     }
     
+    # Auto-detection priority: longer (more specific) profile names first
+    _PROFILE_PRIORITY = tuple(sorted(LOCATION_PROFILES, key=len, reverse=True))
+    
+    # One compiled pattern for all profiles, matching '_' or ' ' between words
+    _PROFILE_RE = re.compile('|'.join(
+        f"(?P<{name}>{re.escape(name).replace('_', '[ _]')})" for name in _PROFILE_PRIORITY
+    ))
+    
     def __init__(self, atm_id: int, atm_name: str, location: str):
         """
         Initialize generator with ATM-specific context
@@ -134,36 +150,45 @@ class SyntheticTransactionGenerator:
         self.atm_id = atm_id
         self.atm_name = atm_name
         self.location = location
+        self._profile_name = 'default'
         self.profile = self._detect_location_profile()
         
+        # Static per-profile values, computed once instead of per day/transaction
+        hours = np.arange(24)
+        weights = np.where(
+            np.isin(hours, self.profile['peak_hours']), 3.0,  # Peak hours get 3x weight
+            np.where((hours >= 6) & (hours <= 22), 1.0, 0.2)  # Normal vs night hours
+        )
+        self._probabilities = weights / weights.sum()
+        self._min_amt, self._max_amt = self.profile['withdrawal_range']
+        self._weekend_multiplier = self.profile['weekend_multiplier']
+        self._seasonality = self.profile['seasonality_factor']
+        
         # Unique seed based on ATM ID for reproducible but unique patterns
-        self.seed = atm_id * 1000 + hash(atm_name) % 1000
-        random.seed(self.seed)
-        np.random.seed(self.seed)
+        # (crc32 is stable across processes, unlike the salted built-in hash())
+        self.seed = atm_id * 1000 + zlib.crc32(atm_name.encode()) % 1000
+        # Per-instance generator (PCG64): no global RNG state, safe across threads
+        self._rng = np.random.default_rng(self.seed)
     
     def _detect_location_profile(self) -> Dict:
-        """Detect location profile from ATM name/location with manual overrides"""
+        """Detect location profile from ATM name/location with manual overrides
+        
+        The matched profile name is recorded in self._profile_name.
+        """
         # Check for manual override first
         if self.atm_id in self.MANUAL_PROFILE_OVERRIDES:
-            profile_name = self.MANUAL_PROFILE_OVERRIDES[self.atm_id]
-            return self.LOCATION_PROFILES[profile_name]
+            self._profile_name = self.MANUAL_PROFILE_OVERRIDES[self.atm_id]
+            return self.LOCATION_PROFILES[self._profile_name]
         
-        # Auto-detection with improved keyword matching
+        # Auto-detection: a single pass over the text collects every profile mentioned
         location_text = (self.atm_name + ' ' + self.location).lower()
-        # Normalize: replace spaces/underscores for matching
-        location_normalized = location_text.replace(' ', '_')
-        
-        # Priority order: check more specific profiles first
-        # Longer profile names should be checked before shorter ones to avoid partial matches
-        sorted_profiles = sorted(self.LOCATION_PROFILES.items(), 
-                                key=lambda x: len(x[0]), 
-                                reverse=True)
+        found = {m.lastgroup for m in self._PROFILE_RE.finditer(location_text)}
         
-        for profile_type, profile in sorted_profiles:
-            # Check both underscore and space versions
-            profile_with_space = profile_type.replace('_', ' ')
-            if profile_type in location_text or profile_type in location_normalized or profile_with_space in location_text:
-                return profile
+        # Priority order: more specific (longer) profile names win
+        for profile_type in self._PROFILE_PRIORITY:
+            if profile_type in found:
+                self._profile_name = profile_type
+                return self.LOCATION_PROFILES[profile_type]
         
         # Default profile if no match
         return {
@@ -176,7 +201,7 @@ class SyntheticTransactionGenerator:
     
     def generate_transactions(self, 
                             days_history: int = 90,
-                            end_date: datetime = None) -> List[Dict]:
+                            end_date: datetime = None) -> pd.DataFrame:
         """
         Generate synthetic transaction history with unique patterns
         
@@ -185,169 +210,165 @@ class SyntheticTransactionGenerator:
             end_date: End date for generation (defaults to now)
         
         Returns:
-            List of transaction dictionaries
+            DataFrame with one row per transaction (id, atm_id, timestamp,
+            amount, transaction_type, success, currency)
         """
-        if end_date is None:
-            end_date = datetime.now()
-        
-        start_date = end_date - timedelta(days=days_history)
-        transactions = []
-        
-        current_date = start_date
-        transaction_id = 1
-        
-        while current_date <= end_date:
-            day_transactions = self._generate_day_transactions(
-                current_date, 
-                transaction_id
-            )
-            transactions.extend(day_transactions)
-            transaction_id += len(day_transactions)
-            current_date += timedelta(days=1)
-        
-        return transactions
+        # The whole history as a single batch keeps generation fully vectorized
+        batch = next(self.generate_transactions_stream(
+            days_history, end_date, batch_days=max(days_history + 1, 1)
+        ), None)
+        if batch is None:
+            # Negative history covers no days
+            return pd.DataFrame({
+                'id': pd.Series(dtype='int64'),
+                'atm_id': pd.Series(dtype='int64'),
+                'timestamp': pd.Series(dtype='datetime64[s]'),
+                'amount': pd.Series(dtype='float64'),
+                'transaction_type': pd.Categorical([], categories=self.TRANSACTION_TYPES),
+                'success': pd.Series(dtype='bool'),
+                'currency': pd.Series(dtype='object')
+            })
+        return batch
     
-    def _generate_day_transactions(self, 
-                                   date: datetime, 
-                                   start_id: int) -> List[Dict]:
-        """Generate transactions for a single day"""
-        transactions = []
-        
-        # Calculate daily volume
-        base_volume = self.profile['base_volume']
-        
-        # Weekend adjustment
-        is_weekend = date.weekday() >= 5
-        weekend_factor = self.profile['weekend_multiplier'] if is_weekend else 1.0
-        
-        # Seasonal adjustment (simple sine wave)
-        day_of_year = date.timetuple().tm_yday
-        seasonal_factor = 1.0 + 0.2 * np.sin(2 * np.pi * day_of_year / 365) * self.profile['seasonality_factor']
-        
-        # Random daily variation (±20%)
-        daily_variation = random.uniform(0.8, 1.2)
-        
-        # Calculate final daily volume
-        daily_volume = int(base_volume * weekend_factor * seasonal_factor * daily_variation)
-        
-        # Generate hourly distribution
-        hourly_transactions = self._distribute_hourly(daily_volume)
-        
-        # Generate individual transactions
-        current_id = start_id
-        for hour in range(24):
-            hour_count = hourly_transactions[hour]
-            
-            for _ in range(hour_count):
-                transaction_time = date.replace(
-                    hour=hour,
-                    minute=random.randint(0, 59),
-                    second=random.randint(0, 59)
-                )
-                
-                transaction = self._generate_single_transaction(
-                    current_id,
-                    transaction_time
-                )
-                transactions.append(transaction)
-                current_id += 1
+    def generate_transactions_stream(self,
+                                     days_history: int = 90,
+                                     end_date: datetime = None,
+                                     batch_days: int = 1) -> Iterator[pd.DataFrame]:
+        """
+        Generate synthetic transaction history in batches of whole days
         
-        return transactions
-    
-    def _distribute_hourly(self, daily_volume: int) -> List[int]:
-        """Distribute daily volume across 24 hours with peak hours"""
-        hourly = [0] * 24
-        peak_hours = self.profile['peak_hours']
+        Only one batch is held in memory at a time, so long histories can be
+        written out incrementally (see write_transactions_jsonl).
         
-        # Assign weights to each hour
-        weights = []
-        for hour in range(24):
-            if hour in peak_hours:
-                weights.append(3.0)  # Peak hours get 3x weight
-            elif 6 <= hour <= 22:  # Normal operating hours
-                weights.append(1.0)
-            else:  # Night hours (reduced activity)
-                weights.append(0.2)
+        Args:
+            days_history: Number of days of history to generate
+            end_date: End date for generation (defaults to now)
+            batch_days: Number of days per yielded batch (at least 1)
         
-        # Normalize weights
-        total_weight = sum(weights)
-        probabilities = [w / total_weight for w in weights]
+        Yields:
+            DataFrames with the same columns as generate_transactions; ids
+            continue across batches
+        """
+        if batch_days < 1:
+            raise ValueError(f'batch_days must be at least 1, got {batch_days}')
         
-        # Distribute transactions
-        for _ in range(daily_volume):
-            hour = np.random.choice(24, p=probabilities)
-            hourly[hour] += 1
+        if end_date is None:
+            end_date = datetime.now()
         
-        return hourly
+        start_date = end_date - timedelta(days=days_history)
+        num_days = days_history + 1  # start_date through end_date inclusive
+        first_day = np.datetime64(start_date.date(), 'D')
+        next_id = 1
+        
+        for offset in range(0, num_days, batch_days):
+            days = first_day + np.arange(offset, min(offset + batch_days, num_days))
+            batch = self._generate_batch(days, next_id)
+            next_id += len(batch)
+            yield batch
     
-    def _generate_single_transaction(self, 
-                                     transaction_id: int,
-                                     timestamp: datetime) -> Dict:
-        """Generate a single transaction with realistic attributes"""
-        min_amount, max_amount = self.profile['withdrawal_range']
-        
-        # Generate amount (favor common denominations)
-        base_amount = random.randint(min_amount // 500, max_amount // 500) * 500
-        
-        # Add some variation for realism
-        if random.random() < 0.3:  # 30% chance of non-standard amount
-            base_amount += random.choice([100, 200, 300, 400])
-        
-        # Transaction types (weighted distribution)
-        transaction_types = ['withdrawal', 'balance_inquiry', 'deposit', 'transfer']
-        type_weights = [0.70, 0.15, 0.10, 0.05]  # Most are withdrawals
-        transaction_type = random.choices(transaction_types, type_weights)[0]
-        
-        # Adjust amount based on transaction type
-        if transaction_type == 'balance_inquiry':
-            amount = 0
-        elif transaction_type == 'deposit':
-            amount = base_amount * random.uniform(0.8, 1.5)
-        else:
-            amount = base_amount
-        
-        return {
-            'id': transaction_id,
+    def _generate_batch(self, days: np.ndarray, first_id: int) -> pd.DataFrame:
+        """Generate transactions for consecutive calendar days (datetime64[D] array)"""
+        num_days = len(days)
+        
+        # Calendar features for every day at once
+        weekday = (days.astype(np.int64) + 3) % 7  # 1970-01-01 was a Thursday
+        day_of_year = (days - days.astype('datetime64[Y]')).astype(np.int64) + 1
+        
+        # Daily volume: weekend adjustment, seasonal sine wave, random ±20% variation
+        weekend_factors = np.where(weekday >= 5, self._weekend_multiplier, 1.0)
+        seasonal_factors = 1.0 + 0.2 * np.sin(2 * np.pi * day_of_year / 365) * self._seasonality
+        daily_variation = self._rng.uniform(0.8, 1.2, num_days)
+        daily_volumes = (
+            self.profile['base_volume'] * weekend_factors * seasonal_factors * daily_variation
+        ).astype(np.int64)
+        total = int(daily_volumes.sum())
+        
+        # Time of day: peak-weighted hour, uniform minute/second, ordered within each day
+        day_index = np.repeat(np.arange(num_days), daily_volumes)
+        hours = self._rng.choice(24, total, p=self._probabilities)
+        seconds = hours * 3600 + self._rng.integers(0, 3600, total)
+        seconds = seconds[np.lexsort((seconds, day_index))]
+        
+        # Transaction types (weighted distribution), drawn first so balance
+        # inquiries (amount 0) skip the amount draws entirely
+        type_codes = self._rng.choice(len(self.TRANSACTION_TYPES), total, p=self.TRANSACTION_TYPE_WEIGHTS)
+        has_amount = type_codes != 1
+        num_amounts = int(has_amount.sum())
+        
+        # Amounts (favor common denominations, 30% non-standard)
+        base_amounts = self._rng.integers(self._min_amt // 500, self._max_amt // 500 + 1, num_amounts) * 500.0
+        non_standard = self._rng.random(num_amounts) < 0.3
+        base_amounts[non_standard] += self._rng.choice([100, 200, 300, 400], int(non_standard.sum()))
+        
+        amounts = np.zeros(total)
+        amounts[has_amount] = base_amounts
+        deposits = type_codes == 2
+        amounts[deposits] *= self._rng.uniform(0.8, 1.5, int(deposits.sum()))
+        amounts = np.round(amounts, 2)
+        
+        success = self._rng.random(total) > 0.02  # 98% success rate
+        
+        # Timestamps as one datetime64 array offset from the first midnight
+        day0 = days[0].astype('datetime64[s]')
+        timestamps = day0 + (day_index * 86400 + seconds).astype('timedelta64[s]')
+        
+        return pd.DataFrame({
+            'id': np.arange(first_id, first_id + total),
             'atm_id': self.atm_id,
-            'timestamp': timestamp.isoformat(),
-            'amount': round(amount, 2),
-            'transaction_type': transaction_type,
-            'success': random.random() > 0.02,  # 98% success rate
+            'timestamp': timestamps,
+            'amount': amounts,
+            'transaction_type': pd.Categorical.from_codes(type_codes, categories=self.TRANSACTION_TYPES),
+            'success': success,
             'currency': 'USD'
-        }
+        })
     
-    def get_summary_stats(self, transactions: List[Dict]) -> Dict:
+    def get_summary_stats(self, transactions: pd.DataFrame) -> Dict:
         """Generate summary statistics for the generated data"""
-        if not transactions:
+        if transactions.empty:
             return {}
         
-        amounts = [t['amount'] for t in transactions if t['amount'] > 0]
+        amounts = transactions['amount'][transactions['amount'] > 0]
+        success_rate = float(transactions['success'].mean() * 100)
+        
+        if amounts.empty:
+            return {
+                'total_transactions': len(transactions),
+                'total_volume': 0.0,
+                'avg_transaction': 0,
+                'median_transaction': 0,
+                'std_transaction': 0,
+                'min_transaction': 0,
+                'max_transaction': 0,
+                'success_rate': success_rate,
+                'profile_type': self._get_profile_name(),
+                'unique_seed': self.seed
+            }
+        
+        # Only the statistics reported below, no extra quartile passes
+        agg = amounts.agg(['sum', 'mean', 'median', 'min', 'max'])
         
         return {
             'total_transactions': len(transactions),
-            'total_volume': sum(amounts),
-            'avg_transaction': np.mean(amounts) if amounts else 0,
-            'median_transaction': np.median(amounts) if amounts else 0,
-            'std_transaction': np.std(amounts) if amounts else 0,
-            'min_transaction': min(amounts) if amounts else 0,
-            'max_transaction': max(amounts) if amounts else 0,
-            'success_rate': sum(1 for t in transactions if t['success']) / len(transactions) * 100,
+            'total_volume': float(agg['sum']),
+            'avg_transaction': float(agg['mean']),
+            'median_transaction': float(agg['median']),
+            'std_transaction': float(amounts.std(ddof=0)),  # population std, as np.std
+            'min_transaction': float(agg['min']),
+            'max_transaction': float(agg['max']),
+            'success_rate': success_rate,
             'profile_type': self._get_profile_name(),
             'unique_seed': self.seed
         }
     
     def _get_profile_name(self) -> str:
         """Get the detected profile name"""
-        for name, profile in self.LOCATION_PROFILES.items():
-            if profile == self.profile:
-                return name
-        return 'default'
+        return self._profile_name
 
 
 def generate_for_atm(atm_id: int, 
                      atm_name: str, 
                      location: str,
-                     days: int = 90) -> Tuple[List[Dict], Dict]:
+                     days: int = 90) -> Tuple[pd.DataFrame, Dict]:
     """
     Convenience function to generate synthetic data for an ATM
     
@@ -358,7 +379,7 @@ def generate_for_atm(atm_id: int,
         days: Number of days of history
     
     Returns:
-        Tuple of (transactions list, summary statistics)
+        Tuple of (transactions DataFrame, summary statistics)
     """
     generator = SyntheticTransactionGenerator(atm_id, atm_name, location)
     transactions = generator.generate_transactions(days_history=days)
@@ -367,6 +388,54 @@ def generate_for_atm(atm_id: int,
     return transactions, stats
 
 
+def write_transactions_jsonl(batches: Iterable[pd.DataFrame], path: str) -> int:
+    """
+    Write transaction batches to a JSON Lines file, one batch at a time
+    
+    Args:
+        batches: DataFrames as yielded by generate_transactions_stream
+        path: Output file path (overwritten)
+    
+    Returns:
+        Number of transactions written
+    """
+    written = 0
+    with open(path, 'w', encoding='utf-8') as f:
+        for batch in batches:
+            if batch.empty:
+                continue
+            # lines=True output already ends with a newline
+            batch.to_json(f, orient='records', lines=True, date_format='iso', date_unit='s')
+            written += len(batch)
+    return written
+
+
+def generate_for_atms(atms: List[Tuple[int, str, str]],
+                      days: int = 90,
+                      max_workers: int = None) -> List[Tuple[pd.DataFrame, Dict]]:
+    """
+    Generate synthetic data for several ATMs concurrently
+    
+    Each generator owns its RNG, so results match sequential generation.
+    
+    Args:
+        atms: List of (atm_id, atm_name, location) tuples
+        days: Number of days of history
+        max_workers: Thread pool size (defaults to CPU count)
+    
+    Returns:
+        List of (transactions DataFrame, summary statistics) in input order
+    """
+    if max_workers is None:
+        max_workers = os.cpu_count() or 1
+    
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        return list(executor.map(
+            lambda atm: generate_for_atm(*atm, days=days),
+            atms
+        ))
+
+
 if __name__ == '__main__':
     # Test generation for a few ATM types
     test_atms = [
@@ -390,5 +459,5 @@ if __name__ == '__main__':
                 print(f"  {key}: {value}")
         
         print(f"\nSample transactions (first 5):")
-        for tx in transactions[:5]:
-            print(f"  {tx['timestamp']}: {tx['transaction_type']} - ₹{tx['amount']:,.2f}")
+        for tx in transactions.head(5).itertuples(index=False):
+            print(f"  {tx.timestamp.isoformat()}: {tx.transaction_type} - ₹{tx.amount:,.2f}")
@@ -5,12 +5,14 @@ Initializes the database and creates root user from .env configuration
 import os
 from app import app, db, User
 from dotenv import load_dotenv
+from sqlalchemy.orm import load_only
 
 def setup_database():
     """Initialize database and create root user"""
     
     # Load environment variables
     load_dotenv()
+    env = {k: os.getenv(k) for k in ('ROOT_USER_NAME', 'ROOT_USER_EMAIL', 'ROOT_USER_PASSWORD')}
     
     with app.app_context():
         print("\n" + "="*70)
@@ -23,7 +25,7 @@ def setup_database():
         print("   ✓ Tables created")
         
         # Check if root user already exists
-        root_email = os.getenv('ROOT_USER_EMAIL')
+        root_email = env['ROOT_USER_EMAIL']
         existing_root = User.query.filter_by(email=root_email).first()
         
         if existing_root:
@@ -31,8 +33,8 @@ def setup_database():
             update = input("Update root user details? (yes/no): ").lower()
             
             if update == 'yes':
-                existing_root.name = os.getenv('ROOT_USER_NAME')
-                existing_root.set_password(os.getenv('ROOT_USER_PASSWORD'))
+                existing_root.name = env['ROOT_USER_NAME']
+                existing_root.set_password(env['ROOT_USER_PASSWORD'])
                 existing_root.is_root = True
                 existing_root.is_approved = True
                 existing_root.is_verified = True
@@ -44,13 +46,13 @@ def setup_database():
             # Create root user
             print("\n2. Creating root user...")
             root_user = User(
-                name=os.getenv('ROOT_USER_NAME'),
+                name=env['ROOT_USER_NAME'],
                 email=root_email,
                 is_root=True,
                 is_approved=True,
                 is_verified=True
             )
-            root_user.set_password(os.getenv('ROOT_USER_PASSWORD'))
+            root_user.set_password(env['ROOT_USER_PASSWORD'])
             
             db.session.add(root_user)
             db.session.commit()
@@ -61,7 +63,10 @@ def setup_database():
         print("DATABASE SETUP COMPLETE")
         print("="*70)
         
-        all_users = User.query.all()
+        # Single query loading only the columns shown below
+        all_users = db.session.execute(
+            db.select(User).options(load_only(User.email, User.is_root, User.is_approved))
+        ).scalars().all()
         print(f"\nTotal users in database: {len(all_users)}")
         print("\nUsers:")
         for user in all_users:
@@ -73,7 +78,7 @@ def setup_database():
         print("✓ System ready to use!")
         print("="*70)
         print("\n🚀 Start the backend: python app.py")
-        print("📧 Root user email:", os.getenv('ROOT_USER_EMAIL'))
+        print("📧 Root user email:", root_email)
         print("\n")
 
 if __name__ == '__main__':
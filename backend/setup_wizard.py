@@ -2,13 +2,20 @@
 Smart ATM System - Initial Setup Wizard
 Run this script after downloading the project to configure your system
 """
+import base64
+import hmac
 import os
 import secrets
+from datetime import datetime
 from getpass import getpass
 
-def generate_secret_key():
-    """Generate a secure random key"""
-    return secrets.token_urlsafe(32)
+def generate_secret_keys(count=2, nbytes=32):
+    """Generate secure random keys from a single entropy draw"""
+    raw = secrets.token_bytes(count * nbytes)
+    return [
+        base64.urlsafe_b64encode(raw[i:i + nbytes]).rstrip(b'=').decode('ascii')
+        for i in range(0, len(raw), nbytes)
+    ]
 
 def create_env_file():
     """Create .env file with user configuration"""
@@ -26,8 +33,7 @@ def create_env_file():
     
     # Generate secure keys
     print("Generating secure keys...")
-    secret_key = generate_secret_key()
-    jwt_secret_key = generate_secret_key()
+    secret_key, jwt_secret_key = generate_secret_keys(2)
     print("✓ Secure keys generated\n")
     
     # Get root user details
@@ -40,16 +46,15 @@ def create_env_file():
         print("❌ Email is required!")
         root_email = input("Enter root user email: ").strip()
     
-    root_password = getpass("Enter root user password: ")
-    while len(root_password) < 6:
-        print("❌ Password must be at least 6 characters!")
-        root_password = getpass("Enter root user password: ")
-    
-    root_password_confirm = getpass("Confirm root user password: ")
-    while root_password != root_password_confirm:
-        print("❌ Passwords do not match!")
+    while True:
         root_password = getpass("Enter root user password: ")
+        if len(root_password) < 6:
+            print("❌ Password must be at least 6 characters!")
+            continue
         root_password_confirm = getpass("Confirm root user password: ")
+        if hmac.compare_digest(root_password.encode(), root_password_confirm.encode()):
+            break
+        print("❌ Passwords do not match!")
     
     print("\n✓ Root user configured\n")
     
@@ -73,7 +78,7 @@ def create_env_file():
     
     # Create .env file
     env_content = f"""# Smart ATM System Configuration
-# Generated on: {os.popen('date /t').read().strip()}
+# Generated on: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}
 
 # Flask Security Keys
 SECRET_KEY={secret_key}
@@ -97,8 +102,14 @@ MAIL_DEFAULT_SENDER={mail_sender}
 DATABASE_URI=
 """
     
-    with open('.env', 'w') as f:
-        f.write(env_content)
+    # Created owner-only (0o600) so the secrets are never world-readable
+    fd = os.open('.env', os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+    try:
+        if hasattr(os, 'fchmod'):
+            os.fchmod(fd, 0o600)  # An existing .env keeps its old mode otherwise
+        os.write(fd, env_content.encode('utf-8'))
+    finally:
+        os.close(fd)
     
     print("\n" + "=" * 70)
     print("✓ Configuration saved to .env file")
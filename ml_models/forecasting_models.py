@@ -5,15 +5,20 @@ Implements ARIMA, LSTM, and Prophet models with ensemble capability
 
 import pandas as pd
 import numpy as np
-from datetime import datetime, timedelta
+from datetime import datetime
+from concurrent.futures import ThreadPoolExecutor
+import hashlib
+import mmap
+import os
 import pickle
 import json
+import threading
 import warnings
 warnings.filterwarnings('ignore')
 
 # Model imports
 from sklearn.preprocessing import MinMaxScaler
-from sklearn.metrics import mean_absolute_error, mean_squared_error, r2_score
+from sklearn.metrics import r2_score
 import statsmodels.api as sm
 from statsmodels.tsa.arima.model import ARIMA
 from statsmodels.tsa.stattools import adfuller
@@ -37,6 +42,72 @@ except ImportError:
     print("Warning: Prophet not available. Install with: pip install prophet")
 
 
+# ADF results keyed by a digest of the tested series (oldest evicted first)
+_ADF_CACHE_SIZE = 128
+_adf_cache = {}
+
+
+def _cached_adf(data):
+    """(ADF statistic, p-value) for a series, reused when the same series is retested"""
+    data = np.ascontiguousarray(data, dtype=float)
+    key = hashlib.blake2b(data.tobytes(), digest_size=16).digest()
+    
+    if key not in _adf_cache:
+        if len(_adf_cache) >= _ADF_CACHE_SIZE:
+            _adf_cache.pop(next(iter(_adf_cache)))
+        _adf_cache[key] = tuple(adfuller(data)[:2])
+    
+    return _adf_cache[key]
+
+
+def load_pickle(filepath):
+    """Unpickle a file through a read-only memory map (served from the page cache)"""
+    with open(filepath, 'rb') as f:
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            return pickle.load(mm)
+
+
+# Shared by all ensembles, created on first use instead of per predict() call
+_ensemble_executor = None
+_ensemble_executor_lock = threading.Lock()
+
+
+def _get_ensemble_executor():
+    """Module-wide thread pool for ensemble member predictions"""
+    global _ensemble_executor
+    with _ensemble_executor_lock:
+        if _ensemble_executor is None:
+            _ensemble_executor = ThreadPoolExecutor(max_workers=4, thread_name_prefix='ensemble')
+        return _ensemble_executor
+
+
+# Loaded models keyed by path -> (mtime, model); a rewritten file replaces its entry
+_MODEL_CACHE_SIZE = 16
+_model_cache = {}
+
+
+def forecast_metrics(y_true, y_pred):
+    """MAE, RMSE, MAPE and R2 for a forecast (MAPE over non-zero actuals only)"""
+    y_true = np.asarray(y_true, dtype=float)
+    y_pred = np.asarray(y_pred, dtype=float)
+    
+    diff = y_true - y_pred
+    abs_diff = np.abs(diff)
+    nonzero = y_true != 0
+    
+    mae = abs_diff.mean()
+    rmse = np.sqrt(np.mean(diff * diff))
+    mape = np.mean(abs_diff[nonzero] / np.abs(y_true[nonzero])) * 100 if nonzero.any() else 0.0
+    r2 = r2_score(y_true, y_pred)
+    
+    return {
+        'MAE': round(mae, 2),
+        'RMSE': round(rmse, 2),
+        'MAPE': round(mape, 2),
+        'R2': round(r2, 4)
+    }
+
+
 class ForecastingModel:
     """Base class for forecasting models"""
     
@@ -49,30 +120,29 @@ class ForecastingModel:
     
     def calculate_metrics(self, y_true, y_pred):
         """Calculate forecasting metrics"""
-        mae = mean_absolute_error(y_true, y_pred)
-        rmse = np.sqrt(mean_squared_error(y_true, y_pred))
-        mape = np.mean(np.abs((y_true - y_pred) / y_true)) * 100
-        r2 = r2_score(y_true, y_pred)
-        
-        self.metrics = {
-            'MAE': round(mae, 2),
-            'RMSE': round(rmse, 2),
-            'MAPE': round(mape, 2),
-            'R2': round(r2, 4)
-        }
+        self.metrics = forecast_metrics(y_true, y_pred)
         return self.metrics
     
     def save_model(self, filepath):
         """Save trained model"""
         with open(filepath, 'wb') as f:
-            pickle.dump(self, f)
+            pickle.dump(self, f, protocol=pickle.HIGHEST_PROTOCOL)
         print(f"✓ Model saved to {filepath}")
     
     @staticmethod
     def load_model(filepath):
-        """Load trained model"""
-        with open(filepath, 'rb') as f:
-            return pickle.load(f)
+        """Load trained model (cached until the file is rewritten)
+        
+        The returned object is shared with every other caller loading the same
+        file: treat it as read-only, and reload or copy it before retraining.
+        """
+        mtime = os.path.getmtime(filepath)
+        entry = _model_cache.get(filepath)
+        if entry is None or entry[0] != mtime:
+            if entry is None and len(_model_cache) >= _MODEL_CACHE_SIZE:
+                _model_cache.pop(next(iter(_model_cache)))
+            entry = _model_cache[filepath] = (mtime, load_pickle(filepath))
+        return entry[1]
 
 
 class ARIMAForecaster(ForecastingModel):
@@ -84,10 +154,10 @@ class ARIMAForecaster(ForecastingModel):
     
     def check_stationarity(self, data):
         """Check if series is stationary using ADF test"""
-        result = adfuller(data)
-        print(f"ADF Statistic: {result[0]:.4f}")
-        print(f"p-value: {result[1]:.4f}")
-        is_stationary = result[1] < 0.05
+        adf_stat, p_value = _cached_adf(data)
+        print(f"ADF Statistic: {adf_stat:.4f}")
+        print(f"p-value: {p_value:.4f}")
+        is_stationary = p_value < 0.05
         print(f"Series is {'stationary' if is_stationary else 'non-stationary'}")
         return is_stationary
     
@@ -149,12 +219,16 @@ class LSTMForecaster(ForecastingModel):
         else:
             scaled_data = self.scaler.transform(data.reshape(-1, 1))
         
-        X, y = [], []
-        for i in range(self.lookback, len(scaled_data)):
-            X.append(scaled_data[i-self.lookback:i, 0])
-            y.append(scaled_data[i, 0])
+        flat = scaled_data.ravel()
+        if len(flat) <= self.lookback:
+            return np.empty((0, self.lookback)), np.empty(0)
         
-        return np.array(X), np.array(y)
+        # Window i is flat[i:i+lookback] with target flat[i+lookback]; the strided
+        # view is copied once into the contiguous array Keras expects
+        X = np.lib.stride_tricks.sliding_window_view(flat[:-1], self.lookback)
+        y = flat[self.lookback:]
+        
+        return np.ascontiguousarray(X), y.copy()
     
     def build_model(self):
         """Build LSTM architecture"""
@@ -167,7 +241,8 @@ class LSTMForecaster(ForecastingModel):
             Dense(1)
         ])
         
-        model.compile(optimizer='adam', loss='mean_squared_error')
+        # Several batches per compiled step amortize the per-step Python overhead
+        model.compile(optimizer='adam', loss='mean_squared_error', steps_per_execution=8)
         return model
     
     def train(self, train_data, epochs=50, batch_size=32, verbose=True):
@@ -199,16 +274,16 @@ class LSTMForecaster(ForecastingModel):
         if not self.is_trained:
             raise ValueError("Model must be trained before prediction")
         
-        predictions = []
-        current_sequence = self.scaler.transform(recent_data[-self.lookback:].reshape(-1, 1))
+        # Seed window followed by the predictions, in one preallocated buffer
+        buffer = np.empty(self.lookback + steps, dtype=np.float32)
+        buffer[:self.lookback] = self.scaler.transform(recent_data[-self.lookback:].reshape(-1, 1)).ravel()
         
-        for _ in range(steps):
-            X_pred = current_sequence[-self.lookback:].reshape(1, self.lookback, 1)
-            next_pred = self.model.predict(X_pred, verbose=0)[0, 0]
-            predictions.append(next_pred)
-            current_sequence = np.append(current_sequence, [[next_pred]], axis=0)
+        for i in range(steps):
+            X_pred = buffer[i:i + self.lookback].reshape(1, self.lookback, 1)
+            # Calling the model directly avoids predict()'s per-call setup overhead
+            buffer[self.lookback + i] = self.model(X_pred, training=False).numpy()[0, 0]
         
-        predictions = self.scaler.inverse_transform(np.array(predictions).reshape(-1, 1))
+        predictions = self.scaler.inverse_transform(buffer[self.lookback:].reshape(-1, 1))
         return np.maximum(predictions.flatten(), 0)
     
     def evaluate(self, test_data, full_data):
@@ -291,18 +366,28 @@ class EnsembleForecaster:
         self.name = "Ensemble"
         self.metrics = {}
     
+    @staticmethod
+    def _predict_one(model, steps, kwargs):
+        """Forecast with a single member model"""
+        if isinstance(model, LSTMForecaster) and 'recent_data' in kwargs:
+            return model.predict(kwargs['recent_data'], steps)
+        return model.predict(steps)
+    
     def predict(self, steps=7, **kwargs):
         """Make ensemble predictions"""
         predictions = []
         
-        for model, weight in zip(self.models, self.weights):
+        # Members only overlap where their predict releases the GIL (TensorFlow,
+        # NumPy kernels); ARIMA forecasting mostly holds it and gains little
+        executor = _get_ensemble_executor()
+        futures = [
+            executor.submit(self._predict_one, model, steps, kwargs)
+            for model in self.models
+        ]
+        
+        for model, weight, future in zip(self.models, self.weights, futures):
             try:
-                if isinstance(model, LSTMForecaster) and 'recent_data' in kwargs:
-                    pred = model.predict(kwargs['recent_data'], steps)
-                else:
-                    pred = model.predict(steps)
-                
-                predictions.append(pred * weight)
+                predictions.append(future.result() * weight)
             except Exception as e:
                 print(f"Warning: {model.name} prediction failed: {e}")
         
@@ -317,17 +402,7 @@ class EnsembleForecaster:
         steps = len(test_data)
         predictions = self.predict(steps, **kwargs)
         
-        mae = mean_absolute_error(test_data, predictions)
-        rmse = np.sqrt(mean_squared_error(test_data, predictions))
-        mape = np.mean(np.abs((test_data - predictions) / test_data)) * 100
-        r2 = r2_score(test_data, predictions)
-        
-        self.metrics = {
-            'MAE': round(mae, 2),
-            'RMSE': round(rmse, 2),
-            'MAPE': round(mape, 2),
-            'R2': round(r2, 4)
-        }
+        self.metrics = forecast_metrics(test_data, predictions)
         return self.metrics
 
 
@@ -386,16 +461,17 @@ def train_all_models(train_data, test_data, atm_name="ATM", verbose=True):
         try:
             prophet = ProphetForecaster()
             
-            # Prepare data for Prophet
-            dates = pd.date_range(end=datetime.now(), periods=len(train_data), freq='D')
+            # Prepare data for Prophet: training days end today (at midnight),
+            # test days follow; one date array is split between the two
+            n_train = len(train_data)
+            offsets = np.arange(-n_train + 1, len(test_data) + 1)
+            dates = (np.datetime64('today', 'D') + offsets).astype('datetime64[ns]')
             train_df = pd.DataFrame({
-                'ds': dates,
+                'ds': dates[:n_train],
                 'y': train_data
             })
-            
-            test_dates = pd.date_range(start=dates[-1] + timedelta(days=1), periods=len(test_data), freq='D')
             test_df = pd.DataFrame({
-                'ds': test_dates,
+                'ds': dates[n_train:],
                 'y': test_data
             })
             
@@ -466,7 +542,7 @@ def train_arima_model(atm_id, daily_demand, order=(5, 1, 2)):
     model_path = os.path.join(model_dir, f'arima_model_atm_{atm_id}.pkl')
     
     with open(model_path, 'wb') as f:
-        pickle.dump(arima.model, f)
+        pickle.dump(arima.model, f, protocol=pickle.HIGHEST_PROTOCOL)
     
     # Save metrics in the same format as existing CSVs
     metrics_path = os.path.join(model_dir, f'model_metrics_atm_{atm_id}.csv')